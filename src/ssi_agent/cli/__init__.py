@@ -5,14 +5,55 @@ This package implements the command-line interface for the SSI Agent using Click
 It is organized into groups for services, authentication, and debugging.
 """
 
+import importlib
+from typing import Any
+
 import click
 
-from .auth import auth
-from .debug import debug
-from .service import service
 
+class LazyGroup(click.Group):
+    """
+    A Click group that imports its subcommands only when they are used.
+
+    Each subgroup pulls in a different part of the agent (pydantic models,
+    systemd helpers, the HTTP client), so importing all of them up-front
+    slows down every invocation of the CLI.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        lazy_subcommands: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        # Maps command name -> "module.attribute" of the click command
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted([*super().list_commands(ctx), *self.lazy_subcommands])
 
-@click.group()
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name in self.lazy_subcommands:
+            return self._load_command(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load_command(self, cmd_name: str) -> click.Command:
+        module_name, attribute = self.lazy_subcommands[cmd_name].rsplit(".", 1)
+        command = getattr(importlib.import_module(module_name), attribute)
+        if not isinstance(command, click.Command):
+            raise ValueError(f"Lazy command '{cmd_name}' is not a click command.")
+        return command
+
+
+@click.group(
+    cls=LazyGroup,
+    lazy_subcommands={
+        "service": "ssi_agent.cli.service.service",
+        "auth": "ssi_agent.cli.auth.auth",
+        "debug": "ssi_agent.cli.debug.debug",
+    },
+)
 @click.version_option()
 def main() -> None:
     """
@@ -24,11 +65,5 @@ def main() -> None:
     pass
 
 
-# Register subgroups
-main.add_command(service)
-main.add_command(auth)
-main.add_command(debug)
-
-
 if __name__ == "__main__":
     main()
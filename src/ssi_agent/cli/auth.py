@@ -3,6 +3,7 @@ SSI Agent CLI - Authentication Commands
 """
 
 import itertools
+import sys
 import time
 
 import click
@@ -67,30 +68,32 @@ def register() -> None:
                             )
                             finalize_resp.raise_for_status()
                             config.save_agent_key(auth_key)
-                            # Clear line
-                            click.echo("\r" + " " * 50 + "\r", nl=False)
+                            _clear_line()
                             click.secho(
                                 "✅ Registration completed successfully!", fg="green"
                             )
                         except requests.exceptions.RequestException as e:
-                            click.echo("\r" + " " * 50 + "\r", nl=False)
+                            _clear_line()
                             click.secho(
                                 f"❌ Finalization failed: {e}."
                                 " Please try registering again.",
                                 fg="red",
                             )
                     else:
-                        click.echo("\r" + " " * 50 + "\r", nl=False)
+                        _clear_line()
                         click.secho(
                             "❌ Registration completed but no key received.", fg="red"
                         )
                     break
                 elif reg_status == "expired":
-                    click.echo("\r" + " " * 50 + "\r", nl=False)
+                    _clear_line()
                     click.secho("❌ Registration code has expired.", fg="red")
                     break
                 elif reg_status == "pending":
-                    # Update spinner
+                    # Update spinner (only when attached to a terminal)
+                    if not sys.stdout.isatty():
+                        time.sleep(0.5)
+                        continue
                     for _ in range(10):
                         click.echo(
                             f"\r{next(spinner)} Waiting for completion...", nl=False
@@ -100,7 +103,7 @@ def register() -> None:
             except requests.exceptions.RequestException as e:
                 # Handle 410 Gone (expired)
                 if e.response and e.response.status_code == 410:
-                    click.echo("\r" + " " * 50 + "\r", nl=False)
+                    _clear_line()
                     click.secho("❌ Registration code expired.", fg="red")
                     break
                 raise e
@@ -109,6 +112,12 @@ def register() -> None:
         click.secho(f"❌ Registration failed: {e}", fg="red", err=True)
 
 
+def _clear_line() -> None:
+    """Erases the spinner line, if the spinner was drawn at all."""
+    if sys.stdout.isatty():
+        click.echo("\x1b[2K\r", nl=False)
+
+
 @auth.command(name="unregister")
 @click.confirmation_option(
     prompt="Are you sure you want to delete this agent? This action is permanent and"
@@ -2,7 +2,7 @@
 SSI Agent CLI - Debug Commands
 """
 
-from datetime import datetime
+import time
 
 import click
 
@@ -34,7 +34,7 @@ def set_status(service_id: str, status: str, message: str | None) -> None:
         click.echo(f"❌ Service '{service_id}' is not installed.")
         return
 
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     msg = message or f"Manual status override to {status}"
     log_line = f"{timestamp}, {status}, {msg}"
 
@@ -6,9 +6,17 @@ from pathlib import Path
 
 import click
 
-from ssi_agent import loader, manager, models, parsers
+from ssi_agent import loader, manager, models, parsers, system
 from ssi_agent.constants import LOG_DIR
 
+_STATUS_COLORS = {
+    models.Status.OK: "green",
+    models.Status.WARNING: "yellow",
+    models.Status.UPDATE: "yellow",
+    models.Status.FAILURE: "red",
+    models.Status.ERROR: "red",
+}
+
 
 @click.group(name="service")
 def service() -> None:
@@ -17,34 +25,71 @@ def service() -> None:
 
 
 @service.command(name="add")
-@click.argument("script_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument(
+    "script_paths",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+)
 @click.option(
     "--no-start", is_flag=True, help="Don't enable/start the service immediately."
 )
-def add_service(script_path: str, no_start: bool) -> None:
+def add_service(script_paths: tuple[str, ...], no_start: bool) -> None:
     """
-    Install a new service script.
+    Install one or more service scripts.
 
-    This copies the script to the agent's internal directory and sets up
+    This copies the scripts to the agent's internal directory and sets up
     the required systemd units.
     """
+    added = []
+    for script_path in script_paths:
+        try:
+            added.append(
+                manager.add(
+                    Path(script_path), start_now=not no_start, defer_reload=True
+                )
+            )
+        except Exception as e:
+            click.secho(f"❌ Error adding service: {e}", fg="red", err=True)
+
+    if not added:
+        return
+
     try:
-        path = Path(script_path)
-        service_id = manager.add(path, start_now=not no_start)
-        click.echo(f"✅ Service '{service_id}' added successfully.")
+        # Reload systemd and start the services once for all of them
+        manager.commit(None if no_start else added)
     except Exception as e:
         click.secho(f"❌ Error adding service: {e}", fg="red", err=True)
+        return
+
+    for service_id in added:
+        click.echo(f"✅ Service '{service_id}' added successfully.")
 
 
 @service.command(name="remove")
-@click.argument("service_id")
-def remove_service(service_id: str) -> None:
-    """Uninstall a service script and remove its systemd units."""
+@click.argument("service_ids", nargs=-1, required=True)
+def remove_service(service_ids: tuple[str, ...]) -> None:
+    """Uninstall service scripts and remove their systemd units."""
+    removed = []
+    for service_id in service_ids:
+        try:
+            manager.remove(service_id, defer_reload=True)
+            removed.append(service_id)
+        except Exception as e:
+            click.secho(f"❌ Error removing service: {e}", fg="red", err=True)
+
+    if not removed:
+        return
+
     try:
-        manager.remove(service_id)
-        click.echo(f"✅ Service '{service_id}' removed.")
+        # Reload systemd once for all of them
+        manager.commit()
     except Exception as e:
         click.secho(f"❌ Error removing service: {e}", fg="red", err=True)
+        return
+
+    for service_id in removed:
+        click.echo(f"✅ Service '{service_id}' removed.")
 
 
 @service.command(name="enable")
@@ -95,23 +140,26 @@ def list_services(show_all: bool) -> None:
         return
 
     # Table formatting
-    max_id = max(len(s.id) for s in services)
-    max_name = max(len(s.name) for s in services)
+    max_id = max_name = 0
+    for s in services:
+        max_id = max(max_id, len(s.id))
+        max_name = max(max_name, len(s.name))
 
     header = (
         f"{'ID':<{max_id}} | {'NAME':<{max_name}} | "
         f"{'VERSION'} | {'ENABLED'} | {'SCHEDULE'}"
     )
-    click.echo(header)
-    click.echo("-" * len(header))
+    rows = [header, "-" * len(header)]
 
     for s in services:
         enabled_str = "Yes" if s.is_enabled else "No"
-        click.echo(
+        rows.append(
             f"{s.id:<{max_id}} | {s.name:<{max_name}} | "
             f"{s.version:<7} | {enabled_str:<7} | {s.schedule}"
         )
 
+    click.echo("\n".join(rows))
+
 
 @service.command(name="status")
 @click.argument("service_id", required=False)
@@ -138,12 +186,12 @@ def status(service_id: str | None, details: bool) -> None:
             continue
 
         try:
-            lines = log_file.read_text().splitlines()
-            if not lines:
+            last_line = system.read_last_line(log_file)
+            if not last_line:
                 click.echo(f"{s.name}: Log file empty.")
                 continue
 
-            timestamp, status, message = parsers.parse_log_line(lines[-1].strip())
+            timestamp, status, message = parsers.parse_log_line(last_line)
 
             if details:
                 click.echo(f"Service: {s.name} ({s.id})")
@@ -160,10 +208,4 @@ def status(service_id: str | None, details: bool) -> None:
 
 
 def _get_status_color(status: models.Status | None) -> str:
-    if status == models.Status.OK:
-        return "green"
-    if status in (models.Status.WARNING, models.Status.UPDATE):
-        return "yellow"
-    if status in (models.Status.FAILURE, models.Status.ERROR):
-        return "red"
-    return "white"
+    return _STATUS_COLORS.get(status, "white") if status else "white"
@@ -8,21 +8,37 @@ like the initial handshake.
 
 import asyncio
 import logging
+import random
 
+from pydantic import TypeAdapter
 from websockets import ClientConnection, ConnectionClosed, State, connect
 
 from . import config, loader
 from .constants import (
+    EVENT_QUEUE_SIZE,
     WEBSOCKET_CLOSE_TIMEOUT,
     WEBSOCKET_PING_INTERVAL,
     WEBSOCKET_PING_TIMEOUT,
 )
-from .events import AgentReadyEvent, AgentReadyPayload, AgentServiceDataModel
+from .events import (
+    AgentEvent,
+    AgentReadyEvent,
+    AgentReadyPayload,
+    AgentServiceDataModel,
+    AgentServiceStatusUpdateEvent,
+)
 
 # Use a module-level logger
 logger = logging.getLogger(__name__)
 
-WEBSOCKET_URI = config.get_uri("websocket")
+# Most queued events taken at once, to drop the superseded status updates
+_SEND_BATCH_SIZE = 64
+
+# A queued event: the id of the service for status updates, and the JSON
+_QueuedEvent = tuple[str | None, bytes]
+
+# Serializes any outgoing event straight to UTF-8 encoded JSON
+_EVENT_ADAPTER: TypeAdapter[AgentEvent] = TypeAdapter(AgentEvent)
 
 
 async def connect_with_retry(agent_key: str) -> ClientConnection:
@@ -35,12 +51,13 @@ async def connect_with_retry(agent_key: str) -> ClientConnection:
     retry_delay = 5
     max_retries = 3  # Number of quick retries before increasing delay
     retry_count = 0
+    websocket_uri = config.get_uri("websocket")
 
     while True:
         try:
             logger.info("Attempting to connect to WebSocket server...")
             connection = await connect(
-                f"{WEBSOCKET_URI}{agent_key}/",
+                f"{websocket_uri}{agent_key}/",
                 ping_interval=WEBSOCKET_PING_INTERVAL,
                 ping_timeout=WEBSOCKET_PING_TIMEOUT,
                 close_timeout=WEBSOCKET_CLOSE_TIMEOUT,
@@ -62,10 +79,13 @@ async def connect_with_retry(agent_key: str) -> ClientConnection:
                 # - After double the delay up to 30s
                 retry_delay = min(30, retry_delay * 2)
 
+            # Randomize the wait so agents restarted together (e.g. after a
+            # backend outage) do not all reconnect at the same moment
+            delay = retry_delay * (0.5 + random.random())
             logger.warning(
-                f"Connection attempt failed: {e}. Retrying in {retry_delay} seconds..."
+                f"Connection attempt failed: {e}. Retrying in {delay:.1f} seconds..."
             )
-            await asyncio.sleep(retry_delay)
+            await asyncio.sleep(delay)
 
 
 async def send_agent_hello(
@@ -83,27 +103,115 @@ async def send_agent_hello(
         if connection.state == State.CLOSED:
             raise ConnectionError("WebSocket connection is closed")
 
-        services = loader.list_services()
-        service_infos = []
-
-        for service in services:
-            service_info = AgentServiceDataModel(
-                id=service.id,
-                name=service.name,
-                description=service.description,
-                version=service.version,
-                schedule=service.schedule,
-            )
-            service_infos.append(service_info)
+        # Listing the services runs systemctl, keep the event loop free meanwhile
+        services = await asyncio.to_thread(loader.list_services)
+        service_infos = [service.to_data_model() for service in services]
 
-        hello_event = AgentReadyEvent(
-            data=AgentReadyPayload(services=service_infos),
+        hello_event = AgentReadyEvent.model_construct(
+            data=AgentReadyPayload.model_construct(services=service_infos),
         )
 
-        await connection.send(hello_event.model_dump_json())
+        await connection.send(_EVENT_ADAPTER.dump_json(hello_event), text=True)
         logger.info(f"Sent agent.ready event with {len(service_infos)} services")
         return service_infos
 
     except Exception as e:
         logger.error(f"Error sending agent_hello event: {e}")
         return None
+
+
+class EventSender:
+    """
+    Sends events over the WebSocket connection from a single task.
+
+    Events can be submitted from any thread (e.g. the monitor threads). They
+    are serialized by the caller and queued on the event loop, where one
+    long-lived task sends them in order. When events pile up, only the latest
+    status update of each service among them is sent, and once the queue is
+    full the outdated status updates are dropped.
+    """
+
+    def __init__(self, connection: ClientConnection):
+        self.connection = connection
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[_QueuedEvent] = asyncio.Queue(
+            maxsize=EVENT_QUEUE_SIZE
+        )
+        self.task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Starts the sending task."""
+        self.task = self.loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the sending task, dropping the events not sent yet."""
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def submit(self, event: AgentEvent) -> None:
+        """Queues an event to be sent. Safe to call from any thread."""
+        service_id = (
+            event.data.service_id
+            if isinstance(event, AgentServiceStatusUpdateEvent)
+            else None
+        )
+        self.loop.call_soon_threadsafe(
+            self._enqueue, (service_id, _EVENT_ADAPTER.dump_json(event))
+        )
+
+    def _enqueue(self, item: _QueuedEvent) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._make_room(item)
+
+    def _make_room(self, item: _QueuedEvent) -> None:
+        """
+        Queues an event into the full queue by dropping status updates.
+
+        Only the latest status of each service is kept. If that is not enough,
+        the oldest status update is dropped. The added and removed events are
+        kept, they are not sent again (unless the queue holds nothing else).
+        """
+        items = [self.queue.get_nowait() for _ in range(self.queue.qsize())]
+        items = _coalesce([*items, item])
+        if len(items) > self.queue.maxsize:
+            oldest_status = next(
+                (i for i, (service_id, _) in enumerate(items) if service_id), None
+            )
+            # With no status update left, the new event cannot be queued
+            items.pop(-1 if oldest_status is None else oldest_status)
+        for queued in items:
+            self.queue.put_nowait(queued)
+        logger.warning("Too many events waiting to be sent, dropped old statuses")
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < _SEND_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            for _, payload in _coalesce(batch):
+                try:
+                    # Sent as a text frame, the JSON is already UTF-8
+                    await self.connection.send(payload, text=True)
+                except Exception as e:
+                    logger.error(f"Error sending event to WebSocket server: {e}")
+
+
+def _coalesce(batch: list[_QueuedEvent]) -> list[_QueuedEvent]:
+    """Drops the status updates followed by a newer one of the same service."""
+    latest = {service_id: i for i, (service_id, _) in enumerate(batch) if service_id}
+    return [
+        (service_id, payload)
+        for i, (service_id, payload) in enumerate(batch)
+        if not service_id or latest[service_id] == i
+    ]
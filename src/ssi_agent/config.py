@@ -1,76 +1,149 @@
 """Configuration management for the Service Status Indicator Agent."""
 
 import json
-from typing import Literal, Never
+import os
+import tempfile
+from typing import Any, Literal, Never
 
 from .constants import CONFIG_DIR, CONFIG_FILE
 
+# (stat signature, parsed config, derived URIs) of the last config file read
+_CacheEntry = tuple[tuple[int, int, int], dict[str, Any], dict[str, str] | None]
+_cache: _CacheEntry | None = None
 
-def save_agent_key(agent_key: str) -> None:
-    """Saves the agent key to the config file."""
+
+def _load() -> dict[str, Any]:
+    """
+    Returns the parsed config file, re-reading it only when it changed on disk.
+
+    Raises:
+        FileNotFoundError: If the config file does not exist.
+        json.JSONDecodeError: If the config file is not valid JSON.
+    """
+    return _load_cached()[1]
+
+
+def _load_cached() -> _CacheEntry:
+    global _cache
+    st = CONFIG_FILE.stat()
+    signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if _cache is None or _cache[0] != signature:
+        with open(CONFIG_FILE) as f:
+            config = json.load(f)
+        _cache = (signature, config, _build_uris(config.get("backend_url")))
+    return _cache
+
+
+def _build_uris(backend_url: str | None) -> dict[str, str] | None:
+    """Derives the backend endpoint URIs from the configured backend URL."""
+    if not backend_url:
+        return None
+
+    s = "s" if backend_url.startswith("https") else ""
+    host = backend_url.rstrip("/").split("://", 1)[-1]
+
+    return {
+        "websocket": f"ws{s}://{host}/ws/agent/",
+        "unregister": f"http{s}://{host}/api/agents/me/",
+        "whoami": f"http{s}://{host}/api/agents/me/",
+        "initiate_registration": f"http{s}://{host}/api/agents/register/initiate/",
+        "registration_status": f"http{s}://{host}/api/agents/register/status/",
+        "register_finalize": f"http{s}://{host}/api/agents/register/finalize/",
+    }
+
+
+def _invalidate() -> None:
+    """Drops the cached config after writing to the config file."""
+    global _cache
+    _cache = None
+
+
+def _read_for_update() -> dict[str, Any]:
+    """Returns a copy of the config to modify, empty if there is none yet."""
+    try:
+        return dict(_load())
+    except (json.JSONDecodeError, FileNotFoundError):
+        # Handle missing, empty or corrupted file
+        return {}
+
+
+def _save(config: dict[str, Any]) -> None:
+    """
+    Writes the config file without ever leaving it incomplete.
+
+    The new content is first written and synced to a temporary file next to
+    the config file. A missing config file is created by renaming it into
+    place. An existing one is overwritten in place instead, which keeps the
+    owner, group and ACL set up by install.sh; if that write is interrupted,
+    the temporary file is left behind with the complete content.
+    """
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    config = {}
-    if CONFIG_FILE.exists():
-        try:
-            with open(CONFIG_FILE) as f:
-                config = json.load(f)
-        except json.JSONDecodeError:
-            # Handle empty or corrupted file
-            pass
+    content = json.dumps(config, indent=4)
 
-    config["agent_key"] = agent_key
+    fd, tmp_path = tempfile.mkstemp(dir=CONFIG_DIR, prefix=".config-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+            os.fchmod(f.fileno(), 0o644)  # The daemon user must be able to read it
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=4)
+    try:
+        config_file = open(CONFIG_FILE, "r+")
+    except FileNotFoundError:
+        os.replace(tmp_path, CONFIG_FILE)
+        _invalidate()
+        return
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    with config_file:
+        config_file.write(content)
+        config_file.truncate()
+        config_file.flush()
+        os.fsync(config_file.fileno())
+    os.unlink(tmp_path)
+    _invalidate()
+
+
+def save_agent_key(agent_key: str) -> None:
+    """Saves the agent key to the config file."""
+    config = _read_for_update()
+    config["agent_key"] = agent_key
+    _save(config)
 
 
 def get_agent_key() -> str | None:
     """Retrieves the agent key from the config file."""
-    if not CONFIG_FILE.exists():
-        return None
-
     try:
-        with open(CONFIG_FILE) as f:
-            config = json.load(f)
+        config = _load()
     except (json.JSONDecodeError, FileNotFoundError):
         return None
 
-    return config.get("agent_key")  # type: ignore[no-any-return]
+    return config.get("agent_key")
 
 
 def remove_agent_key() -> None:
     """Removes the agent key from the config file."""
-    if not CONFIG_FILE.exists():
-        return
-
     try:
-        with open(CONFIG_FILE) as f:
-            config = json.load(f)
+        config = dict(_load())
     except (json.JSONDecodeError, FileNotFoundError):
         return
 
     if "agent_key" in config:
         del config["agent_key"]
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=4)
+        _save(config)
 
 
 def set_backend_url(backend_url: str) -> None:
     """Sets the backend URL in the config file."""
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    config = {}
-    if CONFIG_FILE.exists():
-        try:
-            with open(CONFIG_FILE) as f:
-                config = json.load(f)
-        except json.JSONDecodeError:
-            # Handle empty or corrupted file
-            pass
-
+    config = _read_for_update()
     config["backend_url"] = backend_url
-
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=4)
+    _save(config)
 
 
 def get_uri(
@@ -84,27 +157,13 @@ def get_uri(
     ],
 ) -> str | Never:
     try:
-        with open(CONFIG_FILE) as f:
-            config = json.load(f)
-            backend_url = config.get("backend_url")
-            if not backend_url:
-                raise ValueError('"backend_url" not found in config file.')
-
-            s = "s" if backend_url.startswith("https") else ""
-            host = backend_url.replace(f"http{s}://", "")
-            host = host[:-1] if host.endswith("/") else host
-
-            UriTemplates = {
-                "websocket": f"ws{s}://{host}/ws/agent/",
-                "unregister": f"http{s}://{host}/api/agents/me/",
-                "whoami": f"http{s}://{host}/api/agents/me/",
-                "initiate_registration": f"http{s}://{host}/api/agents/register/initiate/",
-                "registration_status": f"http{s}://{host}/api/agents/register/status/",
-                "register_finalize": f"http{s}://{host}/api/agents/register/finalize/",
-            }
-
-            return UriTemplates[uri]
+        uris = _load_cached()[2]
     except json.JSONDecodeError:
         raise ValueError(f"Config file {CONFIG_FILE} is not valid JSON.")
     except FileNotFoundError:
         raise FileNotFoundError(f"Config file {CONFIG_FILE} does not exist.")
+
+    if uris is None:
+        raise ValueError('"backend_url" not found in config file.')
+
+    return uris[uri]
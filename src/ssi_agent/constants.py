@@ -7,6 +7,8 @@ SSI_AGENT_UNIT_PREFIX = "ssi-"  # Prefix for systemd services
 
 # Directories
 SYSTEM_SERVICES_DIR = Path("/etc/systemd/system")
+# Enabling a service's timer links it here (the timers have WantedBy=timers.target)
+SYSTEM_TIMERS_WANTS_DIR = SYSTEM_SERVICES_DIR / "timers.target.wants"
 INSTALLED_SERVICE_SCRIPTS_DIR = Path(f"/opt/{APP_NAME}/.installed-service-scripts")
 LOG_DIR = Path(f"/var/log/{APP_NAME}")
 CONFIG_DIR = Path(f"/etc/{APP_NAME}")
@@ -16,6 +18,7 @@ CONFIG_FILE = CONFIG_DIR / "config.json"  # Match install.sh format
 WEBSOCKET_PING_INTERVAL = 30
 WEBSOCKET_PING_TIMEOUT = 70
 WEBSOCKET_CLOSE_TIMEOUT = 5
+EVENT_QUEUE_SIZE = 10000  # Events waiting to be sent before new ones are dropped
 
 # Logging
 PUBLIC_DSN = (
@@ -77,6 +77,7 @@ async def daemon() -> None:
     while True:
         # Reset state variables for each connection attempt
         connection = None
+        sender = None
         log_monitor = None
         service_monitor = None
 
@@ -103,12 +104,21 @@ async def daemon() -> None:
             logger.debug(f"Initial services: {services}")
 
             # 4. Start Monitoring
+            # Sender: Sends the events of both monitors over the connection
+            sender = client.EventSender(connection)
+            sender.start()
+
             # Log Monitor: Watches for file changes in LOG_DIR
-            log_monitor = monitor.LogMonitor(connection, agent_key)
+            log_monitor = monitor.LogMonitor(sender, agent_key)
             log_monitor.start()
 
             # # Service Monitor: Watches for systemd service variations
-            service_monitor = monitor.ServiceMonitor(connection, agent_key, services)
+            service_monitor = monitor.ServiceMonitor(
+                sender,
+                agent_key,
+                services,
+                on_change=log_monitor.handler.invalidate,
+            )
             service_monitor.start()
 
             logger.info("SSI Agent is running.")
@@ -134,6 +144,8 @@ async def daemon() -> None:
                 log_monitor.stop()
             if service_monitor:
                 service_monitor.stop()
+            if sender:
+                await sender.stop()
             if connection:
                 await connection.close()
 
@@ -13,9 +13,6 @@ class ServiceStatus(StrEnum):
     ERROR = "ERROR"
     UNKNOWN = "UNKNOWN"
 
-    def __str__(self) -> str:
-        return self.value
-
 
 # --- Models ---
 
@@ -8,61 +8,64 @@ corresponding systemd units.
 """
 
 import logging
+import os
 import re
 from pathlib import Path
 
-from . import system
-from .constants import INSTALLED_SERVICE_SCRIPTS_DIR, SSI_AGENT_UNIT_PREFIX
+from .constants import (
+    INSTALLED_SERVICE_SCRIPTS_DIR,
+    SSI_AGENT_UNIT_PREFIX,
+    SYSTEM_TIMERS_WANTS_DIR,
+)
 from .models import Service
 from .validators import validate_schedule
 
 logger = logging.getLogger(__name__)
 
+# Manifest fields, e.g. "# name: API Health" (matched in a single pass). Each
+# is a line of its own, and an empty value never runs into the next line.
+_METADATA_RE = re.compile(
+    r"^# (name|description|version|schedule|timeout):[ \t]*(.+)", re.MULTILINE
+)
+_REQUIRED_METADATA = ("name", "description", "version", "schedule")
+_METADATA_FIELDS = (*_REQUIRED_METADATA, "timeout")
+_TIMEOUT_RE = re.compile(r"\d+")
+# The manifest is part of the script header, so this is usually all we need to read
+_MANIFEST_READ_SIZE = 4096
 
-def load_from_file(script_path: Path) -> Service:
+
+def load_from_file(script_path: Path, enabled_units: set[str] | None = None) -> Service:
     """
     Parses a .bash script to extract metadata and returns a Service model.
     Checks the system to see if the service is currently enabled.
-    """
-    if not script_path.exists():
-        raise FileNotFoundError(f"Service script {script_path} does not exist.")
 
+    Args:
+        script_path: Path to the .bash script.
+        enabled_units: The enabled ssi timer units, if already known. Avoids
+            checking the timer of this service alone.
+    """
     if script_path.suffix != ".bash":
         raise ValueError(f"Service script {script_path.name} must be a .bash file.")
 
     try:
-        content = script_path.read_text(encoding="utf-8")
-
-        # Regex patterns for metadata
-        name_match = re.search(r"# name:\s*(.+)", content)
-        desc_match = re.search(r"# description:\s*(.+)", content)
-        ver_match = re.search(r"# version:\s*(.+)", content)
-        sched_match = re.search(r"# schedule:\s*(.+)", content)
-        timeout_match = re.search(r"# timeout:\s*(\d+)", content)
-
-        if not name_match:
-            raise ValueError(
-                f"Service script {script_path.name} is missing '# name:' metadata."
-            )
-        if not desc_match:
-            raise ValueError(
-                f"Service script {script_path.name} is missing '# description:' "
-                "metadata."
-            )
-        if not ver_match:
-            raise ValueError(
-                f"Service script {script_path.name} is missing '# version:' metadata."
-            )
-        if not sched_match:
-            raise ValueError(
-                f"Service script {script_path.name} is missing '# schedule:' metadata."
-            )
+        metadata = _read_metadata(script_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Service script {script_path} does not exist.")
 
-        name = name_match.group(1).strip()
-        description = desc_match.group(1).strip()
-        version = ver_match.group(1).strip()
-        schedule = sched_match.group(1).strip()
-        timeout = int(timeout_match.group(1)) if timeout_match else 20
+    try:
+        for field in _REQUIRED_METADATA:
+            if field not in metadata:
+                raise ValueError(
+                    f"Service script {script_path.name} is missing '# {field}:' "
+                    "metadata."
+                )
+
+        name = metadata["name"].strip()
+        description = metadata["description"].strip()
+        version = metadata["version"].strip()
+        schedule = metadata["schedule"].strip()
+        timeout_match = _TIMEOUT_RE.match(metadata.get("timeout", ""))
+        timeout = int(timeout_match.group()) if timeout_match else 20
 
         # Run validations
         if not (3 <= len(name) <= 60):
@@ -84,9 +87,11 @@ def load_from_file(script_path: Path) -> Service:
 
         # Check if the service is enabled in systemd
         # The unit name is always prefix + id + .timer
-        is_enabled = system.is_unit_enabled(
-            f"{SSI_AGENT_UNIT_PREFIX}{service_id}.timer"
-        )
+        timer_unit = f"{SSI_AGENT_UNIT_PREFIX}{service_id}.timer"
+        if enabled_units is not None:
+            is_enabled = timer_unit in enabled_units
+        else:
+            is_enabled = os.path.lexists(SYSTEM_TIMERS_WANTS_DIR / timer_unit)
 
         return Service(
             id=service_id,
@@ -104,6 +109,35 @@ def load_from_file(script_path: Path) -> Service:
         raise
 
 
+def _read_metadata(script_path: Path) -> dict[str, str]:
+    """
+    Reads the manifest fields of a script.
+
+    Only the header of the script is parsed, unless a field (including the
+    optional timeout) is missing from it, in which case the whole file is
+    scanned.
+    """
+    with script_path.open(encoding="utf-8") as f:
+        head = f.read(_MANIFEST_READ_SIZE)
+        if len(head) < _MANIFEST_READ_SIZE:
+            return _parse_metadata(head)  # The whole file fits in the header
+
+        # Leave out the last line, it may be cut in the middle
+        metadata = _parse_metadata(head[: head.rfind("\n") + 1])
+        if all(field in metadata for field in _METADATA_FIELDS):
+            return metadata
+
+        return _parse_metadata(head + f.read())
+
+
+def _parse_metadata(content: str) -> dict[str, str]:
+    """Collects the manifest fields of a script (the first occurrence wins)."""
+    metadata: dict[str, str] = {}
+    for match in _METADATA_RE.finditer(content):
+        metadata.setdefault(match.group(1), match.group(2))
+    return metadata
+
+
 def load_from_id(service_id: str) -> Service | None:
     """
     Attempts to load a service by its ID by looking
@@ -111,11 +145,10 @@ def load_from_id(service_id: str) -> Service | None:
     """
     script_path = INSTALLED_SERVICE_SCRIPTS_DIR / f"{service_id}.bash"
 
-    if not script_path.exists():
-        return None
-
     try:
         return load_from_file(script_path)
+    except FileNotFoundError:
+        return None
     except Exception as e:
         logger.error(f"Error loading service {service_id}: {e}")
         return None
@@ -137,14 +170,48 @@ def list_services(all: bool = False) -> list[Service]:
         )
         return []
 
-    services = []
     # Find all .bash files in the installed scripts directory
-    for script_file in INSTALLED_SERVICE_SCRIPTS_DIR.glob("*.bash"):
-        try:
-            service = load_from_file(script_file)
-            if all or service.is_enabled:
-                services.append(service)
-        except Exception as e:
-            logger.warning(f"Skipping invalid service script {script_file.name}: {e}")
-
-    return services
+    script_files = list(INSTALLED_SERVICE_SCRIPTS_DIR.glob("*.bash"))
+    if not script_files:
+        return []
+
+    # Read all the enabled timers at once instead of once per service
+    enabled_units: set[str] | None
+    try:
+        enabled_units = _list_enabled_timers()
+    except OSError:
+        enabled_units = None  # Fall back to checking each service
+
+    loaded = (_try_load_from_file(f, enabled_units) for f in script_files)
+    return [s for s in loaded if s is not None and (all or s.is_enabled)]
+
+
+def _list_enabled_timers() -> set[str]:
+    """
+    Returns the names of the enabled ssi timer units.
+
+    Enabling a timer links it into timers.target.wants (the [Install] section
+    of the timer template), so reading the links answers what
+    'systemctl is-enabled' would, without running systemctl.
+    """
+    try:
+        with os.scandir(SYSTEM_TIMERS_WANTS_DIR) as entries:
+            return {
+                entry.name
+                for entry in entries
+                if entry.name.startswith(SSI_AGENT_UNIT_PREFIX)
+                and entry.name.endswith(".timer")
+            }
+    except FileNotFoundError:
+        return set()  # No timer has been enabled yet
+
+
+def _try_load_from_file(
+    script_file: Path, enabled_units: set[str] | None = None
+) -> Service | None:
+    """Loads a service script, returning None (and logging) if it is invalid."""
+    try:
+        return load_from_file(script_file, enabled_units)
+    except Exception as e:
+        logger.warning(f"Skipping invalid service script {script_file.name}: {e}")
+        return None
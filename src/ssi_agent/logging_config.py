@@ -1,4 +1,6 @@
+import atexit
 import logging.config
+import logging.handlers
 from importlib.metadata import PackageNotFoundError, version
 
 import sentry_sdk
@@ -33,11 +35,18 @@ CONFIG = {
             "filename": LOG_DIR / "_agent.log",
             "encoding": "utf8",
         },
+        # Hands records over to a listener thread that writes them out, so
+        # logging never blocks the watchdog and asyncio threads on I/O
+        "queue": {
+            "class": "logging.handlers.QueueHandler",
+            "handlers": ["console", "file"],
+            "respect_handler_level": True,
+        },
     },
     "loggers": {
         "ssi_agent": {
             "level": "DEBUG",
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
             "propagate": False,  # Don't pass logs to root logger
         },
     },
@@ -75,6 +84,20 @@ def setup_logging() -> None:
     # Configure Python logging
     print("Configure Python logging...")
     logging.config.dictConfig(CONFIG)
+    _start_queue_listener()
+
+
+def _start_queue_listener() -> None:
+    """Starts writing out the records of the queue handler."""
+    queue_handler = logging.getHandlerByName("queue")
+    if not isinstance(queue_handler, logging.handlers.QueueHandler):
+        raise RuntimeError("The queue log handler is not configured.")
+
+    listener = queue_handler.listener
+    assert listener is not None  # Created by dictConfig from "handlers"
+    listener.start()
+    # Write out the queued records before the process exits
+    atexit.register(listener.stop)
 
 
 def _get_release_version() -> str:
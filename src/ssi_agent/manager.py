@@ -6,9 +6,12 @@ adding, removing, enabling, and disabling, etc. It bridges the gap between
 the data models (loader.py) and the system operations (system.py).
 """
 
+import functools
 import logging
+import os
 import tempfile
 from pathlib import Path
+from typing import Literal
 
 from . import loader, models, system
 from .constants import (
@@ -20,13 +23,18 @@ from .constants import (
 logger = logging.getLogger(__name__)
 
 
-def add(source_script_path: Path, start_now: bool = True) -> str:
+def add(
+    source_script_path: Path, start_now: bool = True, defer_reload: bool = False
+) -> str:
     """
     Installs a new service script and sets up its systemd units.
 
     Args:
         source_script_path: Path to the .bash file provided by the user.
         start_now: If True, enables and starts the service immediately.
+        defer_reload: If True, systemd is not reloaded and the service is not
+            started. When adding several services, pass True for each and
+            call commit() once at the end.
 
     Returns:
         The service_id of the newly added service.
@@ -53,63 +61,100 @@ def add(source_script_path: Path, start_now: bool = True) -> str:
     _install_systemd_units(service, target_path)
 
     # 6. Finalize System State
-    system.reload_daemon()
+    if not defer_reload:
+        system.reload_daemon()
 
-    if start_now:
-        enable(service_id)
-        # Immediate run as requested by user
-        run(service_id)
+        if start_now:
+            enable(service_id)
+            # Immediate run as requested by user
+            run(service_id)
 
     logger.info(f"Service '{service_id}' added successfully.")
     return service_id
 
 
-def remove(service_id: str) -> None:
+def remove(service_id: str, defer_reload: bool = False) -> None:
     """
     Completely removes a service from the system.
+
+    Args:
+        service_id: The ID of the service.
+        defer_reload: If True, systemd is not reloaded. When removing several
+            services, pass True for each and call commit() once at the end.
     """
     service = loader.load_from_id(service_id)
     if not service:
         raise ValueError(f"Service '{service_id}' not found.")
 
-    # 1. Stop and disable
-    disable(service_id)
+    # 1. Stop and disable (the loader already asked systemd whether it is enabled)
+    if service.is_enabled:
+        disable(service_id)
 
     # 2. Remove files
-    unit_prefix = f"{SSI_AGENT_UNIT_PREFIX}{service_id}"
-    system.remove_file(SYSTEM_SERVICES_DIR / f"{unit_prefix}.service")
-    system.remove_file(SYSTEM_SERVICES_DIR / f"{unit_prefix}.timer")
-    system.remove_file(service.script)
+    system.remove_files(
+        [
+            SYSTEM_SERVICES_DIR / _unit_name(service_id, "service"),
+            SYSTEM_SERVICES_DIR / _unit_name(service_id, "timer"),
+            service.script,
+        ]
+    )
 
     # 3. Cleanup systemd
-    system.reload_daemon()
+    if not defer_reload:
+        system.reload_daemon()
     logger.info(f"Service '{service_id}' removed completely.")
 
 
+def commit(started_service_ids: list[str] | None = None) -> None:
+    """
+    Applies the additions and removals made with defer_reload=True.
+
+    Reloads systemd once, then enables and starts the given services with a
+    single systemctl call each.
+
+    Args:
+        started_service_ids: The added services to enable and start now.
+    """
+    system.reload_daemon()
+
+    if started_service_ids:
+        system.enable_unit(
+            [_unit_name(service_id, "timer") for service_id in started_service_ids],
+            now=True,
+        )
+        system.start_unit(
+            [_unit_name(service_id, "service") for service_id in started_service_ids],
+            background=True,
+        )
+        logger.info(f"Services {', '.join(started_service_ids)} enabled and invoked.")
+
+
 def enable(service_id: str) -> None:
     """Enables the systemd timer for a service."""
-    unit_name = f"{SSI_AGENT_UNIT_PREFIX}{service_id}.timer"
-    system.enable_unit(unit_name, now=True)
+    system.enable_unit(_unit_name(service_id, "timer"), now=True)
     logger.info(f"Service '{service_id}' enabled.")
 
 
 def disable(service_id: str) -> None:
     """Disables the systemd timer for a service."""
-    unit_name = f"{SSI_AGENT_UNIT_PREFIX}{service_id}.timer"
-    system.disable_unit(unit_name, now=True)
+    system.disable_unit(_unit_name(service_id, "timer"), now=True)
     logger.info(f"Service '{service_id}' disabled.")
 
 
 def run(service_id: str) -> None:
     """Starts the service unit immediately (one-shot run)."""
-    unit_name = f"{SSI_AGENT_UNIT_PREFIX}{service_id}.service"
-    system.start_unit(unit_name, background=True)
+    system.start_unit(_unit_name(service_id, "service"), background=True)
     logger.info(f"Service '{service_id}' invoked for immediate run.")
 
 
 # --- Internal Helpers ---
 
 
+def _unit_name(service_id: str, unit_type: Literal["service", "timer"]) -> str:
+    """Returns the systemd unit name of a service (e.g. 'ssi-api-health.timer')."""
+    return f"{SSI_AGENT_UNIT_PREFIX}{service_id}.{unit_type}"
+
+
 def _install_systemd_units(service: models.Service, script_path: Path) -> None:
     """Renders and moves systemd unit files into place."""
     template_dir = Path(__file__).parent / "templates"
@@ -126,33 +171,61 @@ def _install_systemd_units(service: models.Service, script_path: Path) -> None:
 
     # Render Service Unit
     service_content = _render_template(template_dir / "base.service", context)
-    _write_privileged_unit(
-        f"{SSI_AGENT_UNIT_PREFIX}{service.id}.service", service_content
-    )
+    _write_privileged_unit(_unit_name(service.id, "service"), service_content)
 
     # Render Timer Unit
     timer_content = _render_template(template_dir / "base.timer", context)
-    _write_privileged_unit(f"{SSI_AGENT_UNIT_PREFIX}{service.id}.timer", timer_content)
+    _write_privileged_unit(_unit_name(service.id, "timer"), timer_content)
 
 
 def _render_template(template_path: Path, context: dict[str, object]) -> str:
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template not found: {template_path}")
+    return _load_template(template_path).format(**context)
 
-    template_text = template_path.read_text(encoding="utf-8")
-    return template_text.format(**context)
+
+@functools.lru_cache(maxsize=8)
+def _load_template(template_path: Path) -> str:
+    """Reads a unit template (they ship with the package and never change)."""
+    try:
+        return template_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Template not found: {template_path}")
 
 
 def _write_privileged_unit(filename: str, content: str) -> None:
-    """Writes a file to a temp location and moves it to systemd via sudo."""
+    """
+    Writes a unit file into the systemd directory.
+
+    When the directory is writable (e.g. running as root) the file is written
+    next to its destination and atomically renamed into place. Otherwise it is
+    written to a temp location and moved to systemd via sudo.
+    """
+    if os.access(SYSTEM_SERVICES_DIR, os.W_OK):
+        _write_unit_atomic(SYSTEM_SERVICES_DIR / filename, content)
+        return
+
     with tempfile.NamedTemporaryFile(mode="w", delete=False) as tf:
         tf.write(content)
+        # Set the final permissions now, mv keeps them (saves a sudo chmod)
+        os.fchmod(tf.fileno(), 0o644)
         temp_path = Path(tf.name)
 
     try:
-        dest_path = SYSTEM_SERVICES_DIR / filename
-        system.move_file(temp_path, dest_path)
-        system.set_permissions(dest_path, "644")
+        system.move_file(temp_path, SYSTEM_SERVICES_DIR / filename)
     finally:
         if temp_path.exists():
             temp_path.unlink()
+
+
+def _write_unit_atomic(dest_path: Path, content: str) -> None:
+    """Writes a file via a sibling temp file and os.replace (no subprocess)."""
+    fd, temp_name = tempfile.mkstemp(
+        dir=dest_path.parent, prefix=".ssi-", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            os.fchmod(f.fileno(), 0o644)
+        os.replace(temp_name, dest_path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
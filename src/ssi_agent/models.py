@@ -4,7 +4,7 @@ from pathlib import Path
 
 from pydantic import BaseModel, Field
 
-from ssi_agent.events import ServiceStatus
+from ssi_agent.events import AgentServiceDataModel, ServiceStatus
 
 
 class Service(BaseModel):
@@ -22,5 +22,16 @@ class Service(BaseModel):
     timeout: int = Field(default=20, ge=1)
     is_enabled: bool = False  # Is the systemd timer active?
 
+    def to_data_model(self) -> AgentServiceDataModel:
+        """Returns the public representation of the service sent to the backend."""
+        # The fields were already validated when this model was built
+        return AgentServiceDataModel.model_construct(
+            id=self.id,
+            name=self.name,
+            description=self.description,
+            version=self.version,
+            schedule=self.schedule,
+        )
+
 
 Status = ServiceStatus
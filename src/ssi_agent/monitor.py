@@ -4,23 +4,25 @@ SSI Agent - Monitor Module
 This module monitors system resources and triggers events based on changes.
 It contains two main monitors:
 1. LogMonitor: Uses `watchdog` to observe changes in log files.
-2. ServiceMonitor: Polls for changes in systemd services (added/removed) from the CLI.
+2. ServiceMonitor: Watches for changes in systemd services (added/removed) from the CLI.
 """
 
 import asyncio
 import logging
 import os
 import threading
-import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
-from websockets import ClientConnection
+from watchdog.observers.api import BaseObserver
+from watchdog.observers.polling import PollingObserver
 
-from . import loader
-from .constants import LOG_DIR
+from . import loader, models
+from .client import EventSender
+from .constants import LOG_DIR, SSI_AGENT_UNIT_PREFIX, SYSTEM_TIMERS_WANTS_DIR
 from .events import (
-    AgentEvent,
     AgentServiceAddedEvent,
     AgentServiceAddedPayload,
     AgentServiceDataModel,
@@ -34,6 +36,18 @@ from .parsers import parse_log_line
 # Use a module-level logger
 logger = logging.getLogger(__name__)
 
+# Only the last line of new log content matters, so at most this much is read
+_TAIL_READ_SIZE = 4096
+# Quiet time after the last modification of a log file before it is read,
+# so a burst of writes results in a single status update
+_DEBOUNCE_DELAY = 0.05  # seconds
+# A log file written to continuously is still read at least this often
+_DEBOUNCE_MAX_DELAY = 1  # seconds
+# How often the log directory is scanned when polling (see SSI_POLL_FS)
+_LOG_POLL_INTERVAL = 30  # seconds
+# Threads reading and parsing the modified log files
+_LOG_READ_WORKERS = 2
+
 
 class LogHandler(FileSystemEventHandler):
     """
@@ -43,84 +57,232 @@ class LogHandler(FileSystemEventHandler):
 
     def __init__(
         self,
-        connection: ClientConnection,
+        sender: EventSender,
         loop: asyncio.AbstractEventLoop,
         agent_key: str,
     ):
         super().__init__()
-        self.file_positions: dict[bytes | str, int] = {}  # Stores last read positions
-        self.connection = connection
+        # Last read positions by path, with the inode of the file read
+        self.file_positions: dict[str, tuple[int, int]] = {}
+        self.sender = sender
         self.loop = loop
         self.agent_key = agent_key
+        # Resolved once, these are compared against every file system event
+        self._log_dir = str(LOG_DIR.absolute())
+        self._agent_log = str((LOG_DIR / "_agent.log").absolute())
+        # Installed services by id, kept until the ServiceMonitor reports a change
+        self._service_cache: dict[str, models.Service] = {}
+        # Service ids by log file path ("<LOG_DIR>/<service_id>.log")
+        self._id_cache: dict[str, str] = {}
+        # Debounce timers of the modified log files, with the (loop) time each
+        # must be read by at the latest. Only used on the event loop.
+        self._pending: dict[str, tuple[asyncio.TimerHandle, float]] = {}
+        # Open log files by path, with the inode each descriptor refers to
+        self._fds: dict[str, tuple[int, int]] = {}
+        # Reads run in these threads, different log files in parallel
+        self._executor = ThreadPoolExecutor(
+            max_workers=_LOG_READ_WORKERS, thread_name_prefix="log-read"
+        )
+        # One lock per log file, held while it is read and its status sent
+        self._read_locks: dict[str, threading.Lock] = {}
+
+    def invalidate(self, service_id: str) -> None:
+        """Forgets the cached service, after it was added or removed."""
+        self._service_cache.pop(service_id, None)
+
+    def _get_service(self, service_id: str) -> models.Service | None:
+        service = self._service_cache.get(service_id)
+        if service is None:
+            # Only found services are cached, so a service installed later
+            # is picked up even before the ServiceMonitor notices it
+            service = loader.load_from_id(service_id)
+            if service is not None:
+                self._service_cache[service_id] = service
+        return service
 
     def on_modified(self, event: FileSystemEvent) -> None:
+        file_path = self._service_log_path(event)
+        if file_path is None:
+            return
+
+        # Defer reading the file until its writes have settled
+        self.loop.call_soon_threadsafe(self._schedule, file_path)
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        file_path = self._service_log_path(event)
+        if file_path is None:
+            return
+
+        # The service may have been removed along with its log
+        self.invalidate(self._service_id(file_path))
+        with self._read_lock(file_path):
+            self._close_log(file_path)
+            self.file_positions.pop(file_path, None)
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        file_path = self._service_log_path(event)
+        if file_path is None:
+            return
+
+        # Rotated away, the next write goes to a new file at this path
+        with self._read_lock(file_path):
+            self._close_log(file_path)
+
+    def close_files(self) -> None:
+        """Waits for the reads in progress and closes the open log files."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for file_path in list(self._fds):
+            with self._read_lock(file_path):
+                self._close_log(file_path)
+
+    def _read_lock(self, file_path: str) -> threading.Lock:
+        # setdefault is atomic, so concurrent callers get the same lock
+        return self._read_locks.setdefault(file_path, threading.Lock())
+
+    def _service_id(self, file_path: str) -> str:
+        service_id = self._id_cache.get(file_path)
+        if service_id is None:
+            service_id = os.path.basename(file_path)[: -len(".log")]
+            self._id_cache[file_path] = service_id
+        return service_id
+
+    def _service_log_path(self, event: FileSystemEvent) -> str | None:
+        """Returns the path of the service log an event is about, if it is one."""
         if event.is_directory:
-            return  # Ignore directory changes
+            return None  # Ignore directory changes
 
-        file_path = event.src_path
-        str_path = str(file_path)  # Convert paths to string for comparison to be safe
+        file_path = os.fsdecode(event.src_path)
 
         if (
-            not str_path.startswith(str(LOG_DIR.absolute()))
-            or not str_path.endswith(".log")
-            or str_path.endswith("_agent.log")  # Ignore the daemon's own logs
+            os.path.dirname(file_path) != self._log_dir
+            or not file_path.endswith(".log")
+            or file_path == self._agent_log  # Ignore the daemon's own logs
         ):
-            return  # Safety checks
-
+            return None  # Safety checks
+
+        return file_path
+
+    def cancel_pending(self) -> None:
+        """Drops the scheduled reads. Must be called from the event loop."""
+        for handle, _ in self._pending.values():
+            handle.cancel()
+        self._pending.clear()
+
+    def _schedule(self, file_path: str) -> None:
+        """(Re)starts the debounce timer of a modified log file."""
+        now = self.loop.time()
+        deadline = now + _DEBOUNCE_MAX_DELAY
+        pending = self._pending.pop(file_path, None)
+        if pending:
+            handle, deadline = pending
+            handle.cancel()
+        delay = max(0, min(_DEBOUNCE_DELAY, deadline - now))
+        handle = self.loop.call_later(delay, self._dispatch, file_path)
+        self._pending[file_path] = (handle, deadline)
+
+    def _dispatch(self, file_path: str) -> None:
+        """Reads the settled log file off the event loop."""
+        del self._pending[file_path]
+        # A dedicated pool, so the reads do not compete with other blocking
+        # work of the loop (e.g. listing the services)
         try:
-            # Initialize file position if first time seeing the file
-            if file_path not in self.file_positions:
-                self.file_positions[file_path] = 0
-
-            with open(file_path, encoding="utf-8") as f:
-                f.seek(self.file_positions[file_path])  # Move to last read position
-                new_lines = f.readlines()
-                self.file_positions[file_path] = f.tell()  # Update position
-
-                # Process the last line (assuming we only care about the latest status)
-                if new_lines:
-                    last_line = new_lines[-1].strip()
-                    if last_line:
-                        service_id = str(os.path.basename(file_path)).replace(
-                            ".log", ""
-                        )
-                        # TODO: Optimization - Cache service lookups?
-                        service = loader.load_from_id(service_id)
-                        if not service:
-                            logger.info(f"Service with ID {service_id} not found.")
-                            return
-
-                        timestamp, status, message = parse_log_line(last_line)
-
-                        if not timestamp or not status:
-                            logger.warning(f"Malformed log line: {last_line}")
-                            return
-
-                        # Create Payload and wrap in AgentServiceStatusUpdateEvent
-                        status_update = AgentServiceStatusUpdatePayload(
-                            service_id=service_id,
-                            timestamp=timestamp,
-                            status=status,
-                            message=message or "",  # Handle None message
-                        )
-                        status_event = AgentServiceStatusUpdateEvent(
-                            data=status_update,
-                        )
-
-                        # Send async message from this sync callback
-                        asyncio.run_coroutine_threadsafe(
-                            self.send_status_update(status_event), self.loop
-                        )
-                        logger.info(f"Sent status update: {status_update.status}")
-        except Exception as e:
-            logger.error(f"Error reading {str_path}: {e}")
+            self._executor.submit(self._process, file_path)
+        except RuntimeError:
+            pass  # Scheduled just before the monitor was stopped
 
-    async def send_status_update(self, status_event: AgentEvent) -> None:
+    def _process(self, file_path: str) -> None:
+        """Sends the latest status written to a log file."""
         try:
-            if self.connection:
-                await self.connection.send(status_event.model_dump_json())
+            # Look the service up first, the logs of unknown services are not read
+            service_id = self._service_id(file_path)
+            service = self._get_service(service_id)
+            if not service:
+                logger.info(f"Service with ID {service_id} not found.")
+                return
+
+            # The status is sent before the lock is released, so the statuses
+            # of a log file are sent in the order its lines were read
+            with self._read_lock(file_path):
+                self._send_last_status(file_path, service_id)
         except Exception as e:
-            logger.error(f"Error sending status update to WebSocket server: {e}")
+            logger.error(f"Error reading {file_path}: {e}")
+
+    def _send_last_status(self, file_path: str, service_id: str) -> None:
+        """Sends the status of the last line written to a log file, if any."""
+        # Process the last line (assuming we only care about the latest status)
+        last_line = self._read_last_new_line(file_path)
+        if not last_line:
+            return
+
+        timestamp, status, message = parse_log_line(last_line)
+
+        if not timestamp or not status:
+            logger.warning(f"Malformed log line: {last_line}")
+            return
+
+        # Create Payload and wrap in AgentServiceStatusUpdateEvent.
+        # The values come typed from the parser, so skip
+        # validation on this per-log-line path.
+        status_update = AgentServiceStatusUpdatePayload.model_construct(
+            service_id=service_id,
+            timestamp=timestamp,
+            status=status,
+            message=message or "",  # Handle None message
+        )
+        status_event = AgentServiceStatusUpdateEvent.model_construct(
+            data=status_update,
+        )
+
+        self.sender.submit(status_event)
+        logger.info(f"Sent status update: {status_update.status}")
+
+    def _read_last_new_line(self, file_path: str) -> str:
+        """
+        Returns the last line written to the file since it was last read.
+
+        Only the tail of the new content is read, however much was appended.
+        A rotated, recreated or truncated log file is read from its start.
+        """
+        st = os.stat(file_path)
+        inode, position = self.file_positions.get(file_path, (st.st_ino, 0))
+        if inode != st.st_ino or st.st_size < position:
+            position = 0  # Another file or truncated in place, start over
+        if st.st_size == position:
+            return ""
+
+        start = max(position, st.st_size - _TAIL_READ_SIZE)
+        fd = self._open_log(file_path, st.st_ino)
+        new_content = os.pread(fd, st.st_size - start, start)
+        self.file_positions[file_path] = (st.st_ino, start + len(new_content))
+
+        # The last line ends before the final line break (if any) and starts
+        # after the one before it, found without copying the content
+        end = len(new_content) - int(new_content.endswith(b"\n"))
+        line_start = new_content.rfind(b"\n", 0, end) + 1
+        return new_content[line_start:end].decode("utf-8", errors="replace").strip()
+
+    def _open_log(self, file_path: str, inode: int) -> int:
+        """
+        Returns a descriptor of the log file, kept open between reads.
+
+        The file is reopened when the path names another file (inode) than
+        the one that was opened, e.g. after log rotation.
+        """
+        cached = self._fds.get(file_path)
+        if cached is not None:
+            fd, fd_inode = cached
+            if fd_inode == inode:
+                return fd
+            self._close_log(file_path)
+
+        fd = os.open(file_path, os.O_RDONLY | os.O_CLOEXEC)
+        self._fds[file_path] = (fd, os.fstat(fd).st_ino)
+        return fd
+
+    def _close_log(self, file_path: str) -> None:
+        cached = self._fds.pop(file_path, None)
+        if cached is not None:
+            os.close(cached[0])
 
 
 class LogMonitor:
@@ -128,13 +290,13 @@ class LogMonitor:
     Orchestrates the watching of log files.
     """
 
-    def __init__(self, connection: ClientConnection, agent_key: str):
-        self.connection = connection
+    def __init__(self, sender: EventSender, agent_key: str):
+        self.sender = sender
         self.agent_key = agent_key
-        self.observer = Observer()
+        self.observer = _new_log_observer()
         # We need the running loop to schedule async tasks from the watchdog thread
         self.loop = asyncio.get_running_loop()
-        self.handler = LogHandler(connection, self.loop, agent_key)
+        self.handler = LogHandler(sender, self.loop, agent_key)
 
     def start(self) -> None:
         """Starts the watchdog observer."""
@@ -147,25 +309,77 @@ class LogMonitor:
         if self.observer.is_alive():
             self.observer.stop()
             self.observer.join()
+            self.handler.cancel_pending()
+            self.handler.close_files()
             logger.info("LogMonitor stopped.")
 
 
+def _new_log_observer() -> BaseObserver:
+    """
+    Returns the observer for the log directory.
+
+    inotify misses writes made through some network file systems (e.g. NFS
+    written from other hosts). Setting SSI_POLL_FS makes the agent poll the
+    directory instead.
+    """
+    if os.getenv("SSI_POLL_FS"):
+        logger.info(f"Polling {LOG_DIR} for changes every {_LOG_POLL_INTERVAL}s.")
+        return PollingObserver(timeout=_LOG_POLL_INTERVAL)
+    return Observer()
+
+
+class TimerLinkHandler(FileSystemEventHandler):
+    """
+    Handles file system events for the links of the enabled timers.
+    Calls back whenever the timer of an SSI service is enabled or disabled.
+    """
+
+    def __init__(self, on_change: Callable[[], None]):
+        super().__init__()
+        self.on_change = on_change
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        if event.event_type not in ("created", "deleted", "moved"):
+            return  # Only the links coming and going matter
+
+        # systemctl creates the links under a temporary name and renames them
+        for path in (event.src_path, event.dest_path):
+            name = os.path.basename(os.fsdecode(path))
+            if name.startswith(SSI_AGENT_UNIT_PREFIX) and name.endswith(".timer"):
+                try:
+                    self.on_change()
+                except Exception as e:
+                    logger.error(f"Error in service change monitoring: {e}")
+                return
+
+
 class ServiceMonitor:
     """
-    Polls for changes in the list of available services.
+    Watches for changes in the list of available services.
+
+    A service is available while its timer is enabled, so the links in
+    SYSTEM_TIMERS_WANTS_DIR are watched. The services are also rescanned
+    periodically, to catch up on anything the watch missed.
     """
 
     def __init__(
         self,
-        connection: ClientConnection,
+        sender: EventSender,
         agent_key: str,
         initial_services: list[AgentServiceDataModel] | None,
+        on_change: Callable[[str], None] | None = None,
     ):
-        self.connection = connection
+        self.sender = sender
         self.agent_key = agent_key
-        self.loop = asyncio.get_running_loop()
+        # Called with the id of every service that was added or removed
+        self.on_change = on_change
         self.running = False
+        # Set by stop(), wakes the monitoring thread up right away
+        self._stop_event = threading.Event()
         self.thread: threading.Thread | None = None
+        self.observer: BaseObserver | None = None
+        # Scans are run from both the watch and the rescan thread
+        self._sync_lock = threading.Lock()
 
         # Initialize known services
         if initial_services is None:
@@ -174,75 +388,77 @@ class ServiceMonitor:
             self.known_services = {service.id for service in initial_services}
 
     def start(self) -> None:
-        """Starts the monitoring thread."""
+        """Starts watching the timer links and the monitoring thread."""
         self.running = True
+        self._stop_event.clear()
+        # The directory only exists once some timer has been enabled
+        if SYSTEM_TIMERS_WANTS_DIR.is_dir():
+            self.observer = Observer()
+            self.observer.schedule(
+                TimerLinkHandler(self._sync),
+                str(SYSTEM_TIMERS_WANTS_DIR),
+                recursive=False,
+            )
+            self.observer.start()
         self.thread = threading.Thread(target=self._watch_loop, daemon=True)
         self.thread.start()
         logger.info("ServiceMonitor started.")
 
     def stop(self) -> None:
-        """Stops the monitoring thread."""
+        """Stops watching the timer links and the monitoring thread."""
         self.running = False
+        self._stop_event.set()
+        if self.observer and self.observer.is_alive():
+            self.observer.stop()
+            self.observer.join()
         if self.thread and self.thread.is_alive():
-            # We don't join/block here because the loop relies on sleep
-            # and we want to return quickly. The thread will exit on next wake.
-            pass
+            # The thread wakes up at once, unless it is in the middle of a scan
+            self.thread.join(timeout=1)
         logger.info("ServiceMonitor stopped.")
 
     def _watch_loop(self) -> None:
         """Internal loop running in a separate thread."""
-        scan_interval = 15  # seconds
+        # While the links are watched, the scans only reconcile missed changes
+        scan_interval = 300 if self.observer else 15  # seconds
 
         while self.running:
             try:
-                current_services = loader.list_services()
-                current_service_ids = {service.id for service in current_services}
-
-                # Check for new services
-                new_services = current_service_ids - self.known_services
-                for service_id in new_services:
-                    # Find the full object
-                    try:
-                        service = next(
-                            s for s in current_services if s.id == service_id
-                        )
-                        service_info = AgentServiceDataModel(
-                            id=service.id,
-                            name=service.name,
-                            description=service.description,
-                            version=service.version,
-                            schedule=service.schedule,
-                        )
-                        added_event = AgentServiceAddedEvent(
-                            data=AgentServiceAddedPayload(service=service_info),
-                        )
-                        asyncio.run_coroutine_threadsafe(
-                            self.connection.send(added_event.model_dump_json()),
-                            self.loop,
-                        )
-                        logger.info(f"Service {service_id} added")
-                    except StopIteration:
-                        continue
-
-                # Check for removed services
-                removed_services = self.known_services - current_service_ids
-                for service_id in removed_services:
-                    removed_event = AgentServiceRemovedEvent(
-                        data=AgentServiceRemovedPayload(service_id=service_id),
-                    )
-                    asyncio.run_coroutine_threadsafe(
-                        self.connection.send(removed_event.model_dump_json()), self.loop
-                    )
-                    logger.info(f"Service {service_id} removed")
-
-                self.known_services = current_service_ids
-
-                # Sleep in small chunks to allow faster shutdown
-                for _ in range(scan_interval):
-                    if not self.running:
-                        break
-                    time.sleep(1)
-
+                self._sync()
             except Exception as e:
                 logger.error(f"Error in service change monitoring: {e}")
-                time.sleep(scan_interval)
+
+            # Returns early (True) when stop() is called
+            if self._stop_event.wait(scan_interval):
+                break
+
+    def _sync(self) -> None:
+        """Sends the services added or removed since the last scan."""
+        with self._sync_lock:
+            current_services = {s.id: s for s in loader.list_services()}
+            current_service_ids = current_services.keys()
+
+            # Check for new services
+            new_services = current_service_ids - self.known_services
+            removed_services = self.known_services - current_service_ids
+            if self.on_change:
+                for service_id in new_services | removed_services:
+                    self.on_change(service_id)
+
+            for service_id in new_services:
+                added_event = AgentServiceAddedEvent(
+                    data=AgentServiceAddedPayload(
+                        service=current_services[service_id].to_data_model()
+                    ),
+                )
+                self.sender.submit(added_event)
+                logger.info(f"Service {service_id} added")
+
+            # Check for removed services
+            for service_id in removed_services:
+                removed_event = AgentServiceRemovedEvent(
+                    data=AgentServiceRemovedPayload(service_id=service_id),
+                )
+                self.sender.submit(removed_event)
+                logger.info(f"Service {service_id} removed")
+
+            self.known_services = set(current_service_ids)
@@ -24,14 +24,15 @@ def parse_log_line(
             return None, None, None
 
         timestamp = parts[0].strip()
+        # "YYYY-MM-DD HH:MM:SS" is ISO 8601, which fromisoformat parses natively
         timestamp_dt: datetime | None = (
-            datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S") if timestamp else None
+            datetime.fromisoformat(timestamp) if timestamp else None
         )
 
-        # Convert to UTC
-        local_timezone = datetime.now().astimezone().tzinfo
+        # Convert to UTC, a naive datetime is taken as local time (with the
+        # DST offset in effect at that time)
         if timestamp_dt:
-            timestamp_dt = timestamp_dt.replace(tzinfo=local_timezone).astimezone(UTC)
+            timestamp_dt = timestamp_dt.astimezone(UTC)
 
         status_str = parts[1].strip()
         status = ServiceStatus(status_str)
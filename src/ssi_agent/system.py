@@ -7,6 +7,7 @@ and sudo requirements, providing a typed and exception-safe API.
 """
 
 import logging
+import os
 import subprocess
 from pathlib import Path
 
@@ -54,52 +55,57 @@ def reload_daemon() -> None:
     _run(["sudo", "systemctl", "daemon-reload"])
 
 
-def enable_unit(unit_name: str, now: bool = True) -> None:
+def enable_unit(unit_name: str | list[str], now: bool = True) -> None:
     """
-    Enables a systemd unit.
+    Enables one or more systemd units (in a single systemctl call).
 
     Args:
-        unit_name: Full name of the unit (e.g., 'ssi_service.timer').
+        unit_name: Full name of the unit (e.g., 'ssi_service.timer'), or a list.
         now: If True, also starts the unit immediately.
     """
     cmd = ["sudo", "systemctl", "enable"]
     if now:
         cmd.append("--now")
-    cmd.append(unit_name)
+    cmd.extend(_unit_names(unit_name))
     _run(cmd)
 
 
-def disable_unit(unit_name: str, now: bool = True) -> None:
+def disable_unit(unit_name: str | list[str], now: bool = True) -> None:
     """
-    Disables a systemd unit.
+    Disables one or more systemd units (in a single systemctl call).
 
     Args:
-        unit_name: Full name of the unit.
+        unit_name: Full name of the unit, or a list.
         now: If True, also stops the unit immediately.
     """
     cmd = ["sudo", "systemctl", "disable"]
     if now:
         cmd.append("--now")
-    cmd.append(unit_name)
+    cmd.extend(_unit_names(unit_name))
     _run(cmd)
 
 
-def start_unit(unit_name: str, background: bool = False) -> None:
+def start_unit(unit_name: str | list[str], background: bool = False) -> None:
     """
-    Starts a systemd unit.
+    Starts one or more systemd units (in a single systemctl call).
 
     Args:
-        unit_name: Full name of the unit.
+        unit_name: Full name of the unit, or a list.
         background: If True, uses --no-block to queue the start without
                     waiting for the unit to finish.
     """
     cmd = ["sudo", "systemctl"]
     if background:
         cmd.append("--no-block")
-    cmd.extend(["start", unit_name])
+    cmd.append("start")
+    cmd.extend(_unit_names(unit_name))
     _run(cmd)
 
 
+def _unit_names(unit_name: str | list[str]) -> list[str]:
+    return [unit_name] if isinstance(unit_name, str) else unit_name
+
+
 def is_unit_enabled(unit_name: str) -> bool:
     """Returns True if the unit is enabled in systemd."""
     try:
@@ -138,9 +144,11 @@ def copy_file(src: Path, dst: Path, mode: str | None = None) -> None:
         dst: Destination path.
         mode: Optional octal permissions (e.g., '755').
     """
-    _run(["sudo", "cp", str(src), str(dst)])
     if mode:
-        set_permissions(dst, mode)
+        # install copies and sets the permissions in a single command
+        _run(["sudo", "install", "-m", mode, str(src), str(dst)])
+    else:
+        _run(["sudo", "cp", str(src), str(dst)])
 
 
 def move_file(src: Path, dst: Path) -> None:
@@ -148,10 +156,10 @@ def move_file(src: Path, dst: Path) -> None:
     _run(["sudo", "mv", str(src), str(dst)])
 
 
-def remove_file(path: Path) -> None:
-    """Removes a file using sudo. Does nothing if file doesn't exist."""
-    if path.exists():
-        _run(["sudo", "rm", str(path)])
+def remove_files(paths: list[Path]) -> None:
+    """Removes files using a single sudo call. Missing files are ignored."""
+    if paths:
+        _run(["sudo", "rm", "-f", "--", *map(str, paths)])
 
 
 def make_directory(path: Path, parents: bool = True) -> None:
@@ -163,11 +171,6 @@ def make_directory(path: Path, parents: bool = True) -> None:
     _run(cmd)
 
 
-def set_permissions(path: Path, mode: str) -> None:
-    """Sets octal permissions for a file/directory using sudo chmod."""
-    _run(["sudo", "chmod", mode, str(path)])
-
-
 def write_log_line(log_path: Path, content: str) -> None:
     """
     Appends a line to a log file in a privileged directory.
@@ -187,6 +190,25 @@ def write_log_line(log_path: Path, content: str) -> None:
         raise RuntimeError(f"Failed to write to log file: {e}")
 
 
+def read_last_line(path: Path, buffer_size: int = 4096) -> str:
+    """
+    Returns the last non-empty line of a file without reading all of it.
+
+    The file is read backwards from its end, doubling the window until it
+    contains a full line. Returns an empty string for an empty file.
+    """
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        while True:
+            start = max(0, size - buffer_size)
+            f.seek(start)
+            tail = f.read(size - start).rstrip(b"\r\n")
+            newline = tail.rfind(b"\n")
+            if newline != -1 or start == 0:
+                return tail[newline + 1 :].decode("utf-8", errors="replace").strip()
+            buffer_size *= 2
+
+
 def tail_file(path: Path, lines: int = 50, follow: bool = False) -> None:
     """
     Executes a privileged tail on a file and streams output to stdout.
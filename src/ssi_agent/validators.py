@@ -2,6 +2,21 @@
 
 import re
 
+# Special time units
+_SPECIAL_SCHEDULES = frozenset({"daily", "weekly", "monthly", "hourly"})
+
+# Complex schedule patterns, compiled into one alternation
+_SCHEDULE_PATTERNS = [
+    # Time-based formats (H:M or H:M:S)
+    r"^\*:[0-9,]+(/[0-9]+)?(:[0-9,]+(/[0-9]+)?)?$",
+    r"^[0-9,]+(/[0-9]+)?:[0-9,]+(/[0-9]+)?(:[0-9,]+(/[0-9]+)?)?$",
+    # Day-based schedules (Day Y-M-D H:M:S)
+    r"^(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+[\*\d\-,]+-[\*\d\-,]+-[\*\d\-,]+\s+[\*\d\-,]+:[\*\d\-,]+:[\*\d\-,]+$",
+    # Generic date-time schedules (Y-M-D H:M:S)
+    r"^[\*\d\-,]+-[\*\d\-,]+-[\*\d\-,]+\s+[\*\d\-,]+:[\*\d\-,]+:[\*\d\-,]+$",
+]
+_SCHEDULE_RE = re.compile("|".join(f"(?:{p})" for p in _SCHEDULE_PATTERNS))
+
 
 def validate_schedule(schedule: str) -> None:
     """Validates the systemd timer schedule format.
@@ -25,23 +40,11 @@ def validate_schedule(schedule: str) -> None:
         - hourly
     """
     # Special time units
-    if schedule.lower() in {"daily", "weekly", "monthly", "hourly"}:
+    if schedule.lower() in _SPECIAL_SCHEDULES:
         return
 
-    # Complex schedule patterns
-    patterns = [
-        # Time-based formats (H:M or H:M:S)
-        r"^\*:[0-9,]+(/[0-9]+)?(:[0-9,]+(/[0-9]+)?)?$",
-        r"^[0-9,]+(/[0-9]+)?:[0-9,]+(/[0-9]+)?(:[0-9,]+(/[0-9]+)?)?$",
-        # Day-based schedules (Day Y-M-D H:M:S)
-        r"^(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+[\*\d\-,]+-[\*\d\-,]+-[\*\d\-,]+\s+[\*\d\-,]+:[\*\d\-,]+:[\*\d\-,]+$",
-        # Generic date-time schedules (Y-M-D H:M:S)
-        r"^[\*\d\-,]+-[\*\d\-,]+-[\*\d\-,]+\s+[\*\d\-,]+:[\*\d\-,]+:[\*\d\-,]+$",
-    ]
-
-    for pattern in patterns:
-        if re.match(pattern, schedule):
-            return
+    if _SCHEDULE_RE.match(schedule):
+        return
 
     raise ValueError(
         f"Invalid schedule format: {schedule}\n"